@@ -0,0 +1,56 @@
+"""
+Генерация данных для бенчмарков поверх generate_dataset из app.
+
+Все пользователи получают один и тот же заранее посчитанный хеш пароля,
+чтобы подготовка не упиралась в медленное хеширование.
+"""
+from app import (
+    db,
+    User,
+    Horse,
+    ROLE_ADMIN,
+    generate_dataset,
+)
+
+PASSWORD = "benchpass"
+
+SCALES = {
+    # название: (владельцы, жокеи, лошади, состязания, участников в заезде)
+    "small": (50, 40, 400, 300, 10),
+    "medium": (300, 150, 3000, 3000, 12),
+    "large": (1500, 400, 15000, 15000, 14),
+}
+
+
+def seed(scale, rng_seed=42):
+    """Создаёт набор данных заданного масштаба; возвращает логины для входа."""
+    owners, jockeys, horses, competitions, field_size = SCALES[scale]
+
+    admin = User(username="bench_admin", full_name="Администратор", role=ROLE_ADMIN)
+    admin.set_password(PASSWORD)
+    db.session.add(admin)
+    db.session.commit()
+
+    generate_dataset(
+        owners=owners,
+        jockeys=jockeys,
+        horses=horses,
+        competitions=competitions,
+        min_field=field_size,
+        max_field=field_size,
+        seed=rng_seed,
+        prefix="bench",
+        password=PASSWORD,
+    )
+
+    busiest_owner = db.session.execute(
+        db.select(Horse.owner_id, db.func.count())
+        .group_by(Horse.owner_id)
+        .order_by(db.func.count().desc())
+        .limit(1)
+    ).first()[0]
+    return {
+        "admin": "bench_admin",
+        "jockey": "bench_jockey0",
+        "owner": db.session.get(User, busiest_owner).username,
+    }
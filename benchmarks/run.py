@@ -0,0 +1,183 @@
+"""
+Бенчмарк маршрутов: задержки (p50/p95/p99) и число SQL-запросов.
+
+Запуск из корня проекта:
+
+    python benchmarks/run.py --scale small
+    python benchmarks/run.py --scale large
+    python benchmarks/run.py --scale medium --update-baseline
+
+База по умолчанию — временный файл SQLite; для PostgreSQL укажите
+--database postgresql+psycopg2://... (таблицы в ней будут пересозданы!).
+
+Результаты сравниваются с benchmarks/baseline.json: если задержка маршрута
+(--gate, по умолчанию медиана — она устойчивее к шуму) выше базовой больше
+чем на --tolerance и на --slack-ms или выросло число SQL-запросов, скрипт
+завершается с кодом 1. Отсутствие базовых значений для масштаба или маршрута
+тоже ошибка: иначе проверка молча ничего не проверяет; --no-gate только
+печатает замеры. Базовые значения есть для всех масштабов (large — сотни
+тысяч результатов) и зависят от машины: обновляйте их (--update-baseline)
+на той же машине, где проходит проверка.
+"""
+import argparse
+import gc
+import json
+import logging
+import os
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+BASELINE_PATH = Path(__file__).with_name("baseline.json")
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--scale", default="small", choices=["small", "medium", "large"])
+    parser.add_argument("--iterations", type=int, default=20)
+    parser.add_argument("--warmup", type=int, default=2)
+    parser.add_argument("--database", default=None)
+    parser.add_argument("--gate", default="p50", choices=["p50", "p95", "p99"])
+    parser.add_argument("--tolerance", type=float, default=0.5)
+    parser.add_argument("--slack-ms", type=float, default=2.0)
+    parser.add_argument("--update-baseline", action="store_true")
+    parser.add_argument("--no-gate", action="store_true", help="только замеры, без сравнения")
+    return parser.parse_args()
+
+
+def percentile(values, q):
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(q * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def main():
+    args = parse_args()
+    database = args.database or "sqlite:///" + os.path.join(
+        tempfile.gettempdir(), f"valkyria-bench-{args.scale}.db"
+    )
+    # подменяем БД до импорта app.py, как и в тестах
+    os.environ["DATABASE_URL"] = database
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+    from app import app, db, Result
+    from benchmarks.dataset import PASSWORD, seed
+
+    # бенчмарк измеряет маршруты, а не ограничение частоты входа;
+    # предупреждения о N+1 видны в числе запросов, в логе они лишние
+    app.config["AUTH_RATE_BURST"] = 10 ** 6
+    app.logger.setLevel(logging.ERROR)
+
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+        started = time.perf_counter()
+        logins = seed(args.scale)
+        print(f"Данные ({args.scale}) подготовлены за {time.perf_counter() - started:.1f} с")
+        some_result_id = db.session.execute(db.select(Result.id).limit(1)).scalar()
+        some_horse_id = db.session.execute(db.select(Result.horse_id).limit(1)).scalar()
+
+    def client_for(username=None):
+        client = app.test_client()
+        if username:
+            client.post("/login", data={"username": username, "password": PASSWORD})
+        return client
+
+    anonymous = client_for()
+    admin = client_for(logins["admin"])
+    jockey = client_for(logins["jockey"])
+    owner = client_for(logins["owner"])
+
+    page_cache = app.extensions["page_cache"]
+    routes = [
+        # (название, клиент, URL, сбрасывать кэш страниц перед запросом)
+        ("index", anonymous, "/", True),
+        ("index_cached", anonymous, "/", False),
+        ("results_list", anonymous, "/results", True),
+        ("competitions_list", anonymous, "/competitions", False),
+        ("dashboard_admin", admin, "/dashboard", False),
+        ("dashboard_jockey", jockey, "/dashboard", False),
+        ("dashboard_owner", owner, "/dashboard", False),
+        ("horses_list_admin", admin, "/horses", False),
+        ("horses_list_owner", owner, "/horses", False),
+        ("result_create_form", admin, "/results/create", False),
+        ("result_edit_form", admin, f"/results/{some_result_id}/edit", False),
+        ("horse_detail", anonymous, f"/horses/{some_horse_id}", False),
+        ("lookup_horses", admin, "/lookup/horses?q=bench%201", False),
+    ]
+
+    sql_metrics = app.extensions["sql_metrics"]
+    report = {}
+    for name, client, url, cold in routes:
+        for _ in range(args.warmup):
+            client.get(url)
+
+        gc.collect()
+        sql_metrics.reset()
+        timings = []
+        for _ in range(args.iterations):
+            if cold:
+                page_cache.invalidate()
+            started = time.perf_counter()
+            response = client.get(url)
+            timings.append((time.perf_counter() - started) * 1000)
+            if response.status_code != 200:
+                raise SystemExit(f"{name}: {url} вернул {response.status_code}")
+
+        totals = sql_metrics.snapshot()
+        requests = sum(d["requests"] for d in totals.values()) or 1
+        queries = sum(d["queries"] for d in totals.values()) / requests
+        report[name] = {
+            "p50_ms": round(statistics.median(timings), 2),
+            "p95_ms": round(percentile(timings, 0.95), 2),
+            "p99_ms": round(percentile(timings, 0.99), 2),
+            "queries": round(queries, 1),
+        }
+
+    print(f"{'маршрут':<22}{'p50, мс':>10}{'p95, мс':>10}{'p99, мс':>10}{'SQL':>8}")
+    for name, row in report.items():
+        print(
+            f"{name:<22}{row['p50_ms']:>10}{row['p95_ms']:>10}"
+            f"{row['p99_ms']:>10}{row['queries']:>8}"
+        )
+
+    baselines = json.loads(BASELINE_PATH.read_text()) if BASELINE_PATH.exists() else {}
+    if args.update_baseline:
+        baselines[args.scale] = report
+        BASELINE_PATH.write_text(json.dumps(baselines, indent=2, sort_keys=True) + "\n")
+        print(f"Базовые значения для {args.scale} сохранены в {BASELINE_PATH.name}")
+        return 0
+
+    if args.no_gate:
+        return 0
+    baseline = baselines.get(args.scale)
+    if not baseline:
+        print(
+            f"Нет базовых значений для {args.scale}: сохраните их (--update-baseline) "
+            f"или запустите с --no-gate."
+        )
+        return 1
+
+    regressions = []
+    for name, row in report.items():
+        base = baseline.get(name)
+        if not base:
+            regressions.append(f"{name}: нет базового значения")
+            continue
+        key = f"{args.gate}_ms"
+        limit = max(base[key] * (1 + args.tolerance), base[key] + args.slack_ms)
+        if row[key] > limit:
+            regressions.append(f"{name}: {args.gate} {row[key]} мс > {limit:.2f} мс")
+        if row["queries"] > base["queries"]:
+            regressions.append(f"{name}: SQL-запросов {row['queries']} > {base['queries']}")
+
+    for line in regressions:
+        print("РЕГРЕССИЯ " + line)
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
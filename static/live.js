@@ -0,0 +1,67 @@
+// Живое обновление сегодняшних состязаний по событиям сервера (Server-Sent
+// Events): строка результата добавляется, меняется или удаляется на месте
+// по данным события; перезагрузка страницы — только по событию refresh
+// (массовые изменения вроде импорта или протокола состязания).
+(function () {
+  var EMPTY_TEXT = "Нет данных о результатах";
+
+  function resultText(data) {
+    return "Место " + (data.place || "—") +
+      ", жокей: " + (data.jockey || "—") +
+      ", лошадь: " + (data.horse || "—") +
+      ", время: " + (data.race_time || "—");
+  }
+
+  // порядок как на сервере: по месту, без места — в конце, затем по id
+  function sortKey(place, id) {
+    return [place ? Number(place) : Infinity, Number(id)];
+  }
+
+  function comesBefore(a, b) {
+    return a[0] < b[0] || (a[0] === b[0] && a[1] < b[1]);
+  }
+
+  function removeResult(cell, id) {
+    var item = cell.querySelector('li[data-result-id="' + id + '"]');
+    if (item) {
+      item.remove();
+    }
+    var list = cell.querySelector("ul");
+    if (list && !list.children.length) {
+      cell.textContent = EMPTY_TEXT;
+    }
+  }
+
+  function upsertResult(cell, data) {
+    removeResult(cell, data.id);
+    var list = cell.querySelector("ul");
+    if (!list) {
+      list = document.createElement("ul");
+      cell.replaceChildren(list);
+    }
+    var item = document.createElement("li");
+    item.dataset.resultId = data.id;
+    item.dataset.place = data.place || "";
+    item.textContent = resultText(data);
+
+    var key = sortKey(data.place, data.id);
+    var next = Array.prototype.find.call(list.children, function (other) {
+      return comesBefore(key, sortKey(other.dataset.place, other.dataset.resultId));
+    });
+    list.insertBefore(item, next || null);
+  }
+
+  document.querySelectorAll("[data-events-url]").forEach(function (row) {
+    var cell = row.querySelector("[data-results]");
+    var source = new EventSource(row.dataset.eventsUrl);
+    source.addEventListener("result", function (event) {
+      upsertResult(cell, JSON.parse(event.data));
+    });
+    source.addEventListener("result_deleted", function (event) {
+      removeResult(cell, JSON.parse(event.data).id);
+    });
+    source.addEventListener("refresh", function () {
+      window.location.reload();
+    });
+  });
+})();
@@ -0,0 +1,47 @@
+// Подсказки для полей формы результата: записи подгружаются по мере ввода
+// (не больше десятка за запрос), выбранный вариант пишется в скрытое поле id.
+document.querySelectorAll("[data-lookup-url]").forEach(function (input, index) {
+  // скрытое поле ищется рядом с полем ввода: в протоколе состязания
+  // одноимённых полей по одному на строку
+  var hidden = input.parentElement.querySelector(
+    'input[type="hidden"][name="' + input.dataset.lookupTarget + '"]'
+  );
+  var list = document.createElement("datalist");
+  var ids = {};
+  var timer = null;
+
+  list.id = "lookup-" + index;
+  input.setAttribute("list", list.id);
+  input.after(list);
+
+  function load() {
+    var url = input.dataset.lookupUrl + "?q=" + encodeURIComponent(input.value.trim());
+    fetch(url, { credentials: "same-origin" })
+      .then(function (response) { return response.json(); })
+      .then(function (items) {
+        ids = {};
+        list.replaceChildren();
+        items.forEach(function (item) {
+          var option = document.createElement("option");
+          option.value = item.label;
+          ids[item.label] = item.id;
+          list.appendChild(option);
+        });
+        pick();
+      });
+  }
+
+  function pick() {
+    if (ids.hasOwnProperty(input.value)) {
+      hidden.value = ids[input.value];
+    }
+  }
+
+  input.addEventListener("input", function () {
+    hidden.value = "";
+    pick();
+    clearTimeout(timer);
+    timer = setTimeout(load, 200);
+  });
+  input.addEventListener("focus", load, { once: true });
+});
@@ -30,6 +30,11 @@ def app_ctx():
     Чистый app context и чистая БД для каждого теста.
     """
     with app.app_context():
+        app.extensions["page_cache"].invalidate()
+        app.extensions["user_cache"].clear()
+        app.extensions["auth_limiter"].reset()
+        app.extensions["standings_cache"].invalidate()
+        app.extensions["data_version"].invalidate()
         db.drop_all()
         db.create_all()
         yield app
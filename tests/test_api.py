@@ -0,0 +1,130 @@
+from datetime import date, time
+
+from sqlalchemy import event
+
+from app import (
+    db,
+    User,
+    Horse,
+    Competition,
+    Result,
+    ROLE_JOCKEY,
+    ROLE_OWNER,
+)
+
+
+def _seed():
+    owner = User(username="owner_api", full_name="Владелец API", role=ROLE_OWNER)
+    owner.set_password("pass")
+    jockey = User(username="jockey_api", full_name="Жокей API", role=ROLE_JOCKEY, age=30)
+    jockey.set_password("pass")
+    db.session.add_all([owner, jockey])
+    db.session.commit()
+
+    horses = [Horse(name=f"Конь {i}", owner_id=owner.id) for i in range(3)]
+    comps = [
+        Competition(name="Первый", date=date(2025, 1, 1), time=time(12, 0), place="Тула"),
+        Competition(name="Второй", date=date(2025, 2, 1)),
+        Competition(name="Третий", date=date(2025, 3, 1)),
+    ]
+    db.session.add_all(horses + comps)
+    db.session.commit()
+
+    for horse, place in zip(horses, (2, None, 1)):
+        db.session.add(
+            Result(competition_id=comps[0].id, horse_id=horse.id, jockey_id=jockey.id, place=place)
+        )
+    db.session.commit()
+    return comps, horses, jockey
+
+
+def test_api_competitions_cursor_and_fields(client, app_ctx):
+    """
+    Модуль: /api/v1/competitions.
+
+    Ожидаемое:
+      - курсорная пагинация по (дата, время, id) по убыванию;
+      - ?fields ограничивает набор полей, неизвестное поле — 400.
+    """
+    _seed()
+
+    first = client.get("/api/v1/competitions?per_page=2&fields=name,date").get_json()
+    assert first["items"] == [
+        {"name": "Третий", "date": "2025-03-01"},
+        {"name": "Второй", "date": "2025-02-01"},
+    ]
+    assert first["prev_cursor"] is None
+
+    second = client.get(f"/api/v1/competitions?per_page=2&after={first['next_cursor']}").get_json()
+    assert [c["name"] for c in second["items"]] == ["Первый"]
+    assert second["items"][0]["time"] == "12:00:00"
+    assert second["next_cursor"] is None
+
+    assert client.get("/api/v1/competitions?fields=password_hash").status_code == 400
+
+
+def test_api_results_horse_and_jockey(client, app_ctx):
+    """
+    Модули: /api/v1/competitions/<id>/results, /api/v1/horses/<id>,
+    /api/v1/jockeys/<id>.
+
+    Ожидаемое:
+      - результаты упорядочены по месту, без места — в конце;
+      - карточки лошади и жокея, 404 для несуществующих.
+    """
+    comps, horses, jockey = _seed()
+
+    data = client.get(f"/api/v1/competitions/{comps[0].id}/results").get_json()
+    assert [(r["horse"], r["place"]) for r in data["items"]] == [
+        ("Конь 2", 1),
+        ("Конь 0", 2),
+        ("Конь 1", None),
+    ]
+    assert client.get("/api/v1/competitions/999/results").status_code == 404
+
+    horse = client.get(f"/api/v1/horses/{horses[0].id}").get_json()
+    assert horse["owner"] == "Владелец API"
+
+    card = client.get(f"/api/v1/jockeys/{jockey.id}?fields=full_name,starts").get_json()
+    assert card == {"full_name": "Жокей API", "starts": 0}
+    assert client.get(f"/api/v1/jockeys/{horse['owner_id']}").status_code == 404
+
+
+def test_api_fields_narrow_the_select(client, app_ctx):
+    """
+    Модули: ?fields= в /api/v1/competitions, /api/v1/competitions/<id>/results,
+    /api/v1/jockeys/<id>.
+
+    Ожидаемое:
+      - в SELECT попадают только запрошенные поля и ключи курсора;
+      - соединения с лошадьми, жокеями и статистикой делаются, только
+        когда их поля запрошены.
+    """
+    comps, horses, jockey = _seed()
+    statements = []
+
+    def _capture(conn, cursor, statement, parameters, context, executemany):
+        statements.append(" ".join(statement.lower().split()))
+
+    def select_for(url, table):
+        statements.clear()
+        response = client.get(url)
+        assert response.status_code == 200
+        return next(s for s in statements if f" from {table} " in f"{s} ")
+
+    event.listen(db.engine, "before_cursor_execute", _capture)
+    try:
+        sql = select_for("/api/v1/competitions?fields=name", "competitions")
+        columns = sql[: sql.index(" from ")]
+        assert "competitions.name" in columns and "competitions.place" not in columns
+
+        sql = select_for(f"/api/v1/competitions/{comps[0].id}/results?fields=place", "results")
+        assert "join" not in sql
+        assert "race_time" not in sql
+        sql = select_for(f"/api/v1/competitions/{comps[0].id}/results?fields=place,horse", "results")
+        assert "join horses" in sql and "join users" not in sql
+
+        sql = select_for(f"/api/v1/jockeys/{jockey.id}?fields=full_name", "users")
+        assert "jockey_stats" not in sql
+    finally:
+        event.remove(db.engine, "before_cursor_execute", _capture)
@@ -137,3 +137,132 @@ def test_profile_invalid_age_shows_error(client, app_ctx):
     )
     text = resp.get_data(as_text=True)
     assert "Возраст должен быть числом." in text
+
+
+def test_user_loader_served_from_cache(client, app_ctx):
+    """
+    Модуль: user_loader (кэш учётных записей).
+
+    Данные:
+      - вошедший владелец открывает /profile дважды, между запросами
+        сессия SQLAlchemy очищается (как между реальными запросами).
+
+    Ожидаемое:
+      - повторный запрос не обращается к таблице users;
+      - после изменения профиля кэш сброшен и виден новый ФИО.
+    """
+    from flask import g
+    from sqlalchemy import event
+
+    from app import app
+
+    def new_request_state():
+        # в тестах app context общий для всех запросов: сбрасываем то,
+        # что в реальном приложении живёт только в пределах запроса
+        db.session.expunge_all()
+        g.pop("_login_user", None)
+
+    user = User(username="cached", full_name="Кэшируемый", role=ROLE_OWNER)
+    user.set_password("pass")
+    db.session.add(user)
+    db.session.commit()
+    client.post("/login", data={"username": "cached", "password": "pass"})
+
+    cache = app.extensions["user_cache"]
+    statements = []
+
+    def _count(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(db.engine, "before_cursor_execute", _count)
+    try:
+        new_request_state()
+        client.get("/profile")
+        new_request_state()
+        hits = cache.hits
+        statements.clear()
+        resp = client.get("/profile")
+    finally:
+        event.remove(db.engine, "before_cursor_execute", _count)
+
+    assert resp.status_code == 200
+    assert cache.hits == hits + 1
+    assert not [s for s in statements if "FROM users" in s]
+
+    client.post("/profile", data={"full_name": "Новое ФИО"})
+    new_request_state()
+    assert "Новое ФИО" in client.get("/profile").get_data(as_text=True)
+
+
+def test_login_throttled_per_username(client, app_ctx):
+    """
+    Модуль: /login (token bucket на IP и логин).
+
+    Ожидаемое:
+      - после исчерпания лимита попыток вход отвечает 429 без проверки пароля.
+    """
+    from app import app
+
+    burst = app.config["AUTH_RATE_BURST"]
+    for _ in range(burst):
+        resp = client.post("/login", data={"username": "ghost", "password": "x"})
+        assert resp.status_code == 200
+
+    resp = client.post("/login", data={"username": "ghost", "password": "x"})
+    assert resp.status_code == 429
+    assert "Слишком много попыток входа." in resp.get_data(as_text=True)
+
+
+def test_login_rehashes_password_with_outdated_cost(client, app_ctx):
+    """
+    Модуль: /login (пересчёт хеша при смене PASSWORD_HASH_METHOD).
+
+    Данные:
+      - пароль захеширован pbkdf2 с низкой стоимостью.
+
+    Ожидаемое:
+      - вход успешен, хеш пересчитан текущим методом.
+    """
+    from werkzeug.security import generate_password_hash
+
+    user = User(
+        username="legacy",
+        full_name="Legacy",
+        role=ROLE_OWNER,
+        password_hash=generate_password_hash("pass", "pbkdf2:sha256:1000"),
+    )
+    db.session.add(user)
+    db.session.commit()
+    assert user.password_needs_rehash()
+
+    resp = client.post(
+        "/login", data={"username": "legacy", "password": "pass"}, follow_redirects=True
+    )
+    assert "Успешный вход в систему." in resp.get_data(as_text=True)
+
+    db.session.refresh(user)
+    assert not user.password_needs_rehash()
+    assert user.check_password("pass")
+
+
+def test_login_rejected_when_hash_queue_full(client, app_ctx, monkeypatch):
+    """
+    Модуль: /login (переполнение очереди хеширования).
+
+    Ожидаемое:
+      - запрос сразу получает 503, а не ждёт освобождения пула.
+    """
+    from app import app, PasswordHasher
+
+    user = User(username="busy", full_name="Busy", role=ROLE_OWNER)
+    user.set_password("pass")
+    db.session.add(user)
+    db.session.commit()
+
+    hasher = PasswordHasher(app.config["PASSWORD_HASH_METHOD"], workers=1, queue_limit=1)
+    hasher._slots.acquire()  # единственный слот занят другим запросом
+    monkeypatch.setitem(app.extensions, "password_hasher", hasher)
+
+    resp = client.post("/login", data={"username": "busy", "password": "pass"})
+    assert resp.status_code == 503
+    assert "Сервер перегружен" in resp.get_data(as_text=True)
@@ -112,3 +112,173 @@ def test_jockey_cannot_create_horse(client, app_ctx):
     )
     text = resp.get_data(as_text=True)
     assert "Доступ запрещён." in text
+
+
+def test_competitions_keyset_pagination(client, app_ctx):
+    """
+    Модуль: /competitions (курсорная пагинация).
+
+    Данные:
+      - 5 состязаний, два из них в один день (одно без времени);
+      - per_page=2.
+
+    Ожидаемое:
+      - страницы по ссылкам «Далее» покрывают все состязания ровно один раз
+        в порядке (дата, время, id) по убыванию;
+      - ссылка «Назад» возвращает предыдущую страницу.
+    """
+    import re
+    from datetime import time
+
+    comps = [
+        Competition(name="A", date=date(2025, 5, 1), time=time(10, 0)),
+        Competition(name="B", date=date(2025, 5, 3), time=time(9, 0)),
+        Competition(name="C", date=date(2025, 5, 3), time=None),
+        Competition(name="D", date=date(2025, 5, 3), time=time(15, 0)),
+        Competition(name="E", date=date(2025, 4, 1), time=time(12, 0)),
+    ]
+    db.session.add_all(comps)
+    db.session.commit()
+
+    def names(html):
+        return re.findall(r"<td>([A-E])</td>", html)
+
+    def link(html, label):
+        match = re.search(r'href="([^"]+)">[^<]*' + label, html)
+        return match.group(1).replace("&amp;", "&") if match else None
+
+    seen = []
+    pages = []
+    url = "/competitions?per_page=2"
+    while url:
+        html = client.get(url).get_data(as_text=True)
+        pages.append(html)
+        seen.extend(names(html))
+        url = link(html, "Далее")
+
+    assert seen == ["D", "B", "C", "A", "E"]
+    assert link(pages[0], "Назад") is None
+
+    back = client.get(link(pages[1], "Назад")).get_data(as_text=True)
+    assert names(back) == ["D", "B"]
+
+
+def test_keyset_pages_read_in_index_order(client, app_ctx):
+    """
+    Модули: /results, /competitions (план запроса страницы после курсора).
+
+    Данные:
+      - 4 состязания по 3 результата (одно место пустое), per_page=2.
+
+    Ожидаемое:
+      - по ссылкам «Далее» результаты идут по (дата, время, id) состязания
+        и месту, без места — в конце состязания, каждый ровно один раз;
+      - SQLite читает страницу по индексам: поиск по дате от курсора
+        в ix_competitions_date_time_id, без временного B-дерева для сортировки.
+    """
+    import re
+
+    from sqlalchemy import event
+
+    from app import Result
+
+    owner = User(username="owner_k", full_name="Owner K", role=ROLE_OWNER)
+    owner.set_password("pass")
+    jockey = User(username="jockey_k", full_name="Жокей K", role=ROLE_JOCKEY)
+    jockey.set_password("pass")
+    db.session.add_all([owner, jockey])
+    db.session.flush()
+    horses = [Horse(name=f"Конь {n}", owner_id=owner.id) for n in range(3)]
+    comps = [Competition(name=f"Этап {n}", date=date(2025, 5, n + 1)) for n in range(4)]
+    db.session.add_all(horses + comps)
+    db.session.flush()
+    for comp in comps:
+        for horse, place in zip(horses, (2, None, 1)):
+            db.session.add(
+                Result(competition_id=comp.id, horse_id=horse.id, jockey_id=jockey.id, place=place)
+            )
+    db.session.commit()
+
+    statements = []
+
+    def _capture(conn, cursor, statement, parameters, context, executemany):
+        if "ORDER BY" in statement:
+            statements.append((statement, parameters))
+
+    seen = []
+    url = "/results?per_page=2"
+    event.listen(db.engine, "before_cursor_execute", _capture)
+    try:
+        while url:
+            html = client.get(url).get_data(as_text=True)
+            seen += re.findall(r"<td>(Этап \d)</td>\s*<td>(\d|—)</td>\s*<td>(Конь \d)</td>", html)
+            match = re.search(r'href="([^"]+)">[^<]*Далее', html)
+            url = match.group(1).replace("&amp;", "&") if match else None
+        html = client.get("/competitions?per_page=2").get_data(as_text=True)
+        client.get(re.search(r'href="([^"]+)">[^<]*Далее', html).group(1).replace("&amp;", "&"))
+    finally:
+        event.remove(db.engine, "before_cursor_execute", _capture)
+
+    expected = [
+        (f"Этап {n}", place, horse)
+        for n in (3, 2, 1, 0)
+        for place, horse in (("1", "Конь 2"), ("2", "Конь 0"), ("—", "Конь 1"))
+    ]
+    assert seen == expected
+
+    paged = [(sql, params) for sql, params in statements if "competitions.date <=" in sql]
+    assert {"FROM results" in sql for sql, _ in paged} == {True, False}
+    connection = db.engine.raw_connection()
+    try:
+        for sql, params in paged:
+            plan = " | ".join(row[3] for row in connection.execute("EXPLAIN QUERY PLAN " + sql, params))
+            assert "TEMP B-TREE" not in plan, plan
+            assert "ix_competitions_date_time_id (date<?)" in plan, plan
+    finally:
+        connection.close()
+
+
+def test_search_finds_horses_jockeys_and_competitions_by_prefix(client, app_ctx):
+    """
+    Модуль: /search (полнотекстовый индекс).
+
+    Данные:
+      - лошадь «Гроза», жокей «Громов Пётр», владелец «Громова Анна»;
+      - состязание «Кубок Грома» в Пятигорске;
+      - затем лошадь переименована, жокей удалён.
+
+    Ожидаемое:
+      - префикс «гро» в любом регистре находит лошадь, жокея и состязание;
+      - владельцы в выдачу не попадают;
+      - индекс следует за переименованием и удалением.
+    """
+    from app import search_entities
+
+    owner = User(username="owner_s", full_name="Громова Анна", role=ROLE_OWNER)
+    owner.set_password("pass")
+    jockey = User(username="jockey_s", full_name="Громов Пётр", role=ROLE_JOCKEY)
+    jockey.set_password("pass")
+    db.session.add_all([owner, jockey])
+    db.session.commit()
+    horse = Horse(name="Гроза", owner_id=owner.id)
+    db.session.add_all(
+        [horse, Competition(name="Кубок Грома", date=date(2024, 5, 1), place="Пятигорск")]
+    )
+    db.session.commit()
+
+    hits = search_entities("ГРО")
+    assert {(hit.kind, hit.title) for hit in hits} == {
+        ("horse", "Гроза"),
+        ("jockey", "Громов Пётр"),
+        ("competition", "Кубок Грома"),
+    }
+    assert [hit.title for hit in search_entities("кубок пятиг")] == ["Кубок Грома"]
+
+    response = client.get("/search?q=гроз")
+    assert "Гроза" in response.get_data(as_text=True)
+
+    horse.name = "Буря"
+    db.session.delete(jockey)
+    db.session.commit()
+    assert {hit.title for hit in search_entities("гро")} == {"Кубок Грома"}
+    assert [hit.id for hit in search_entities("бур")] == [horse.id]
@@ -0,0 +1,231 @@
+import gzip
+import os
+import re
+import shutil
+
+import pytest
+
+from app import app
+
+
+def test_html_and_json_compressed_by_accept_encoding(client, app_ctx):
+    """
+    Модуль: сжатие ответов (after_request).
+
+    Данные:
+      - главная страница с Accept-Encoding gzip, br и без него;
+      - короткий JSON-ответ.
+
+    Ожидаемое:
+      - gzip и brotli отдаются по запросу клиента, тело распаковывается в тот же HTML;
+      - без Accept-Encoding ответ не сжат, но с Vary: Accept-Encoding;
+      - тело меньше порога не сжимается.
+    """
+    plain = client.get("/")
+    assert "Content-Encoding" not in plain.headers
+    assert "Accept-Encoding" in plain.headers["Vary"]
+
+    packed = client.get("/", headers={"Accept-Encoding": "gzip"})
+    assert packed.headers["Content-Encoding"] == "gzip"
+    assert gzip.decompress(packed.data) == plain.data
+
+    brotli = pytest.importorskip("brotli")
+    packed = client.get("/", headers={"Accept-Encoding": "gzip;q=0.5, br"})
+    assert packed.headers["Content-Encoding"] == "br"
+    assert brotli.decompress(packed.data) == plain.data
+
+    small = client.get("/api/v1/competitions", headers={"Accept-Encoding": "gzip"})
+    assert small.is_json and "Content-Encoding" not in small.headers
+
+
+def test_cached_page_compressed_once(client, app_ctx, monkeypatch):
+    """
+    Модуль: cached_page, сжатие страниц из кэша.
+
+    Данные:
+      - три запроса главной страницы с Accept-Encoding: gzip подряд.
+
+    Ожидаемое:
+      - страница сжимается один раз, остальные ответы берут копию из кэша;
+      - тело распаковывается в тот же HTML, что и без сжатия.
+    """
+    import app as app_module
+
+    app.extensions["page_cache"].invalidate()
+    calls = []
+    original = app_module.compress_body
+
+    def counting(data, encoding):
+        calls.append(encoding)
+        return original(data, encoding)
+
+    monkeypatch.setattr(app_module, "compress_body", counting)
+    responses = [client.get("/", headers={"Accept-Encoding": "gzip"}) for _ in range(3)]
+    assert calls == ["gzip"]
+    plain = client.get("/")
+    for response in responses:
+        assert response.headers["Content-Encoding"] == "gzip"
+        assert gzip.decompress(response.data) == plain.data
+
+
+def test_static_urls_fingerprinted_and_precompressed(client, app_ctx, tmp_path, monkeypatch):
+    """
+    Модули: static_fingerprint, static_file, CLI compress-static.
+
+    Данные:
+      - копия каталога static во временной папке.
+
+    Ожидаемое:
+      - в HTML ссылка на стили с отпечатком ?v=, по ней — immutable на год;
+      - без отпечатка — обычная проверка свежести;
+      - после compress-static отдаётся предсжатая копия с исходным типом;
+      - изменение файла меняет отпечаток, устаревшая копия не отдаётся.
+    """
+    static = tmp_path / "static"
+    shutil.copytree(app.static_folder, static)
+    monkeypatch.setattr(app, "static_folder", str(static))
+    (static / "styles.css").write_text("body { color: black; }\n" * 100)
+
+    html = client.get("/").get_data(as_text=True)
+    url = re.search(r'href="(/static/styles\.css\?v=\w+)"', html).group(1)
+    resp = client.get(url)
+    assert resp.headers["Cache-Control"] == "public, max-age=31536000, immutable"
+    assert "immutable" not in client.get("/static/styles.css").headers["Cache-Control"]
+
+    out = app.test_cli_runner().invoke(args=["compress-static"]).output
+    assert "Записано сжатых файлов:" in out
+    resp = client.get(url, headers={"Accept-Encoding": "gzip"})
+    assert resp.headers["Content-Encoding"] == "gzip"
+    assert resp.mimetype == "text/css"
+    assert gzip.decompress(resp.get_data()) == (static / "styles.css").read_bytes()
+
+    styles = static / "styles.css"
+    styles.write_text("body { color: red; }\n" * 100)
+    stat = styles.stat()
+    os.utime(styles, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+    app.extensions["page_cache"].invalidate()  # при выкладке кэш страниц новый
+    html = client.get("/").get_data(as_text=True)
+    assert url not in html
+    resp = client.get("/static/styles.css", headers={"Accept-Encoding": "gzip"})
+    assert "Content-Encoding" not in resp.headers
+    assert b"red" in resp.get_data()
+
+
+def test_public_pages_answer_304_until_data_changes(client, app_ctx, admin_user, login):
+    """
+    Модули: conditional_page, DataVersion, touch_public_data.
+
+    Данные:
+      - анонимный зритель повторно открывает /, /results и /competitions;
+      - администратор добавляет состязание.
+
+    Ожидаемое:
+      - ответы со слабым ETag и Last-Modified;
+      - повтор с If-None-Match или If-Modified-Since — 304 без SQL-запросов;
+      - после записи прежний ETag не совпадает, страница отдаётся заново;
+      - страницы авторизованных пользователей без ETag.
+    """
+    from flask import g
+    from sqlalchemy import event
+
+    from app import db
+
+    spectator = app.test_client()
+    first = spectator.get("/")
+    etag = first.headers["ETag"]
+    assert etag.startswith('W/"')
+    assert "Last-Modified" in first.headers
+
+    statements = []
+
+    def _count(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(db.engine, "before_cursor_execute", _count)
+    try:
+        for url in ("/", "/results", "/competitions"):
+            resp = spectator.get(url, headers={"If-None-Match": etag})
+            assert resp.status_code == 304
+            assert resp.data == b""
+        resp = spectator.get("/", headers={"If-Modified-Since": first.headers["Last-Modified"]})
+        assert resp.status_code == 304
+    finally:
+        event.remove(db.engine, "before_cursor_execute", _count)
+    assert statements == []
+
+    login()
+    assert "ETag" not in client.get("/").headers
+    client.post("/competitions/create", data={"name": "Новый кубок", "date": "2025-07-01"})
+    g.pop("_login_user", None)  # g общий для запросов внутри app_ctx
+
+    resp = spectator.get("/", headers={"If-None-Match": etag})
+    assert resp.status_code == 200
+    assert resp.headers["ETag"] != etag
+    assert "Новый кубок" in resp.get_data(as_text=True)
+
+
+def test_recreated_counters_never_reuse_old_etag(client, app_ctx, admin_user, login):
+    """
+    Модули: public_page_validators, reconcile_counters.
+
+    Данные:
+      - запись состязания, затем база пересоздаётся и та же запись повторяется
+        (номер версии данных снова 1).
+
+    Ожидаемое:
+      - ETag после пересоздания отличается: прежний If-None-Match даёт 200.
+    """
+    from flask import g
+
+    from app import db, User, ROLE_ADMIN
+
+    def write_and_etag():
+        login()
+        client.post("/competitions/create", data={"name": "Кубок", "date": "2025-07-01"})
+        client.get("/logout")
+        g.pop("_login_user", None)
+        return app.test_client().get("/").headers["ETag"]
+
+    etag = write_and_etag()
+    db.session.remove()
+    db.drop_all()
+    db.create_all()
+    app.extensions["data_version"].invalidate()
+    admin = User(username="admin", full_name="Администратор", role=ROLE_ADMIN)
+    admin.set_password("adminpass")
+    db.session.add(admin)
+    db.session.commit()
+
+    assert write_and_etag() != etag
+    resp = app.test_client().get("/", headers={"If-None-Match": etag})
+    assert resp.status_code == 200
+
+
+def test_cached_page_body_matches_its_etag(client, app_ctx, monkeypatch):
+    """
+    Модули: conditional_page, cached_page, PageCache.
+
+    Данные:
+      - главная в кэше; данные меняются в обход записи, затем ETag
+        страницы меняется (новый выпуск) без сброса кэша процесса.
+
+    Ожидаемое:
+      - с прежним ETag отдаётся тело из кэша;
+      - с новым ETag кэш промахивается: тело отрендерено заново
+        и совпадает с новым ETag.
+    """
+    import app as app_module
+    from app import db, Competition
+    from datetime import date
+
+    spectator = app.test_client()
+    first = spectator.get("/")
+    db.session.add(Competition(name="Тихий кубок", date=date.today()))
+    db.session.commit()
+    assert "Тихий кубок" not in spectator.get("/").get_data(as_text=True)
+
+    monkeypatch.setattr(app_module, "RELEASE_TOKEN", "next-release")
+    resp = spectator.get("/", headers={"If-None-Match": first.headers["ETag"]})
+    assert resp.status_code == 200
+    assert "next-release" in resp.headers["ETag"]
+    assert "Тихий кубок" in resp.get_data(as_text=True)
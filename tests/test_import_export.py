@@ -0,0 +1,357 @@
+import io
+import json
+from datetime import date
+
+from app import (
+    db,
+    User,
+    Horse,
+    Competition,
+    Result,
+    JockeyStats,
+    SiteCounters,
+    COUNTERS_ID,
+    ROLE_JOCKEY,
+    ROLE_OWNER,
+)
+
+
+def _seed_reference_data():
+    owner = User(username="owner_imp", full_name="Owner Imp", role=ROLE_OWNER)
+    owner.set_password("pass")
+    other_owner = User(username="owner_two", full_name="Owner Two", role=ROLE_OWNER)
+    other_owner.set_password("pass")
+    jockey = User(username="jockey_imp", full_name="Жокей Импорт", role=ROLE_JOCKEY)
+    jockey.set_password("pass")
+    db.session.add_all([owner, other_owner, jockey])
+    db.session.commit()
+
+    db.session.add_all(
+        [
+            Horse(name="Гроза", owner_id=owner.id),
+            Horse(name="Вихрь", owner_id=owner.id),
+            Horse(name="Вихрь", owner_id=other_owner.id),
+            Competition(name="Осенний кубок", date=date(2024, 9, 1)),
+        ]
+    )
+    db.session.commit()
+    return jockey
+
+
+def test_admin_uploads_csv_results(client, app_ctx, admin_user, login):
+    """
+    Модуль: /results/import (загрузка CSV администратором).
+
+    Данные:
+      - CSV с разделителем «;»: две корректные строки, неизвестный жокей,
+        неоднозначная кличка без владельца.
+
+    Ожидаемое:
+      - корректные строки вставлены, остальные отклонены с номерами строк;
+      - статистика жокея пересчитана.
+    """
+    jockey = _seed_reference_data()
+    login()
+
+    csv_data = (
+        "competition;competition_date;horse;owner;jockey;place;race_time\n"
+        "Осенний кубок;2024-09-01;Гроза;;jockey_imp;1;01:40.00\n"
+        "Осенний кубок;2024-09-01;Вихрь;owner_two;jockey_imp;2;01:41.50\n"
+        "Осенний кубок;2024-09-01;Вихрь;;jockey_imp;3;\n"
+        "Осенний кубок;2024-09-01;Гроза;;nobody;4;\n"
+    )
+    resp = client.post(
+        "/results/import",
+        data={"file": (io.BytesIO(csv_data.encode("utf-8")), "season.csv")},
+        content_type="multipart/form-data",
+    )
+    text = resp.get_data(as_text=True)
+    assert "добавлено 2, обновлено 0, отклонено 2" in text
+    assert "кличка неоднозначна" in text
+    assert "жокей не найден" in text
+
+    assert Result.query.count() == 2
+    stats = db.session.get(JockeyStats, jockey.id)
+    assert (stats.starts, stats.wins, stats.best_time_cs) == (2, 1, 10000)
+
+
+def test_import_results_cli_is_idempotent(app_ctx, tmp_path):
+    """
+    Модуль: CLI import-results (JSON Lines).
+
+    Ожидаемое:
+      - повторный импорт того же файла обновляет строки, а не дублирует их;
+      - изменённое место из файла попадает в базу.
+    """
+    _seed_reference_data()
+    rows = [
+        {"competition": "Осенний кубок", "competition_date": "2024-09-01",
+         "horse": "Гроза", "jockey": "jockey_imp", "place": 2, "race_time": "01:45.00"},
+        {"competition": "Осенний кубок", "competition_date": "2024-09-01",
+         "horse": "Вихрь", "owner": "owner_imp", "jockey": "jockey_imp", "place": 1},
+    ]
+    path = tmp_path / "results.jsonl"
+    path.write_text("\n".join(json.dumps(r, ensure_ascii=False) for r in rows), encoding="utf-8")
+
+    runner = app_ctx.test_cli_runner()
+    out = runner.invoke(args=["import-results", str(path), "--batch-size", "1"]).output
+    assert "Добавлено: 2, обновлено: 0." in out
+
+    rows[0]["place"] = 3
+    path.write_text("\n".join(json.dumps(r, ensure_ascii=False) for r in rows), encoding="utf-8")
+    out = runner.invoke(args=["import-results", str(path)]).output
+    assert "Добавлено: 0, обновлено: 2." in out
+
+    db.session.expire_all()
+    assert Result.query.count() == 2
+    assert {r.place for r in Result.query.all()} == {1, 3}
+
+
+def test_import_json_array_streamed_with_one_lookup_per_batch(app_ctx, monkeypatch):
+    """
+    Модули: import_results (JSON-массив), ResultImporter.
+
+    Данные:
+      - JSON-массив с результатами трёх состязаний, одно уже с результатом;
+      - файл читается кусками по 16 символов.
+
+    Ожидаемое:
+      - элементы разобраны по одному, без json.load всего файла;
+      - имеющиеся результаты всех состязаний пакета читаются одним запросом;
+      - имеющийся результат обновлён, остальные вставлены.
+    """
+    from sqlalchemy import event
+
+    import app as app_module
+
+    jockey = _seed_reference_data()
+    autumn = Competition.query.filter_by(name="Осенний кубок").one()
+    groza = Horse.query.filter_by(name="Гроза").one()
+    db.session.add_all(
+        [
+            Competition(name="Зимний кубок", date=date(2024, 12, 1)),
+            Competition(name="Весенний кубок", date=date(2025, 4, 1)),
+            Result(competition_id=autumn.id, horse_id=groza.id, jockey_id=jockey.id, place=3),
+        ]
+    )
+    db.session.commit()
+
+    rows = [
+        {"competition": name, "competition_date": day, "horse": "Гроза",
+         "jockey": "jockey_imp", "place": 1, "race_time": "01:40.00"}
+        for name, day in (
+            ("Осенний кубок", "2024-09-01"),
+            ("Зимний кубок", "2024-12-01"),
+            ("Весенний кубок", "2025-04-01"),
+        )
+    ]
+    monkeypatch.setattr(app_module.json, "load", None)
+    chunked = app_module._iter_json_array
+    monkeypatch.setattr(
+        app_module, "_iter_json_array", lambda stream: chunked(stream, chunk_size=16)
+    )
+
+    statements = []
+
+    def _capture(conn, cursor, statement, parameters, context, executemany):
+        statements.append(" ".join(statement.lower().split()))
+
+    event.listen(db.engine, "before_cursor_execute", _capture)
+    try:
+        report = app_module.import_results(io.StringIO(json.dumps(rows, ensure_ascii=False)), "json")
+    finally:
+        event.remove(db.engine, "before_cursor_execute", _capture)
+
+    assert (report.inserted, report.updated, report.rejected_count) == (2, 1, 0)
+    lookups = [s for s in statements if s.startswith("select results.id, results.competition_id")]
+    assert len(lookups) == 1
+    db.session.expire_all()
+    assert {r.place for r in Result.query} == {1}
+
+
+def test_import_conflict_rolls_back_and_reports_row(client, app_ctx, admin_user, login, monkeypatch):
+    """
+    Модули: /results/import, ResultImporter.conflict, проверка мест.
+
+    Данные:
+      - результат лошади в состязании добавлен параллельно: импорт его
+        не видит при чтении (имитация гонки) и пытается вставить;
+      - отдельный файл с местами 0 и -1.
+
+    Ожидаемое:
+      - вместо 500 — сообщение с номером конфликтной строки, импорт
+        откатан целиком;
+      - места меньше 1 отклоняются, как в протоколе состязания.
+    """
+    from app import ResultImporter
+
+    jockey = _seed_reference_data()
+    autumn = Competition.query.filter_by(name="Осенний кубок").one()
+    groza = Horse.query.filter_by(name="Гроза").one()
+    db.session.add(Result(competition_id=autumn.id, horse_id=groza.id, jockey_id=jockey.id, place=5))
+    db.session.commit()
+    login()
+
+    load_existing = ResultImporter._load_existing
+
+    def load_missing_concurrent_row(self, competition_ids):
+        load_existing(self, competition_ids)
+        for existing in self._existing.values():
+            existing.pop(groza.id, None)
+
+    monkeypatch.setattr(ResultImporter, "_load_existing", load_missing_concurrent_row)
+
+    def upload(csv_data):
+        resp = client.post(
+            "/results/import",
+            data={"file": (io.BytesIO(csv_data.encode("utf-8")), "season.csv")},
+            content_type="multipart/form-data",
+            follow_redirects=True,
+        )
+        assert resp.status_code == 200
+        return resp.get_data(as_text=True)
+
+    text = upload(
+        "competition,competition_date,horse,owner,jockey,place\n"
+        "Осенний кубок,2024-09-01,Вихрь,owner_two,jockey_imp,1\n"
+        "Осенний кубок,2024-09-01,Гроза,,jockey_imp,2\n"
+    )
+    assert "Импорт отменён" in text
+    assert "строка 3" in text
+    db.session.expire_all()
+    assert [r.place for r in Result.query] == [5]
+
+    monkeypatch.setattr(ResultImporter, "_load_existing", load_existing)
+    text = upload(
+        "competition,competition_date,horse,owner,jockey,place\n"
+        "Осенний кубок,2024-09-01,Вихрь,owner_two,jockey_imp,0\n"
+        "Осенний кубок,2024-09-01,Вихрь,owner_imp,jockey_imp,-1\n"
+    )
+    assert "добавлено 0, обновлено 0, отклонено 2" in text
+    assert text.count("место должно быть положительным") == 2
+
+
+def test_export_results_csv_and_jsonl(client, app_ctx):
+    """
+    Модули: /results/export.csv, /results/export.jsonl.
+
+    Данные:
+      - два состязания с результатами.
+
+    Ожидаемое:
+      - CSV с заголовком и строками по порядку дат и мест;
+      - фильтр date_from отсекает раннее состязание;
+      - некорректная дата — 400.
+    """
+    jockey = _seed_reference_data()
+    spring = Competition(name="Весенний кубок", date=date(2025, 4, 1))
+    db.session.add(spring)
+    db.session.commit()
+    autumn = Competition.query.filter_by(name="Осенний кубок").one()
+    groza = Horse.query.filter_by(name="Гроза").one()
+    vikhr = Horse.query.filter_by(name="Вихрь").first()
+    db.session.add_all(
+        [
+            Result(competition_id=autumn.id, horse_id=vikhr.id, jockey_id=jockey.id, place=2),
+            Result(competition_id=autumn.id, horse_id=groza.id, jockey_id=jockey.id, place=1,
+                   race_time="01:40.00", race_time_cs=10000),
+            Result(competition_id=spring.id, horse_id=groza.id, jockey_id=jockey.id, place=1),
+        ]
+    )
+    db.session.commit()
+
+    resp = client.get("/results/export.csv")
+    assert resp.status_code == 200
+    lines = resp.get_data(as_text=True).splitlines()
+    assert lines[0].startswith("competition,competition_date")
+    assert lines[1] == "Осенний кубок,2024-09-01,,Гроза,Owner Imp,Жокей Импорт,1,01:40.00"
+    assert len(lines) == 4
+
+    resp = client.get("/results/export.jsonl?date_from=2025-01-01")
+    rows = [json.loads(line) for line in resp.get_data(as_text=True).splitlines()]
+    assert [r["competition"] for r in rows] == ["Весенний кубок"]
+
+    assert client.get("/results/export.csv?date_to=вчера").status_code == 400
+
+
+def test_seed_cli_generates_consistent_dataset(app_ctx):
+    """
+    Модуль: CLI seed (синтетические данные).
+
+    Данные:
+      - два запуска с одним seed, но разными префиксами;
+      - повторный запуск с занятым префиксом.
+
+    Ожидаемое:
+      - созданы владельцы, жокеи, лошади, заезды и результаты;
+      - места в заезде идут подряд с 1, лошадь в заезде не повторяется;
+      - счётчики и статистика жокеев пересчитаны;
+      - распределение данных одинаково при одинаковом seed;
+      - занятый префикс отклоняется без изменений.
+    """
+    runner = app_ctx.test_cli_runner()
+    args = [
+        "seed", "--owners", "5", "--jockeys", "8", "--horses", "30",
+        "--competitions", "12", "--min-field", "3", "--max-field", "6",
+        "--batch-size", "7",
+    ]
+    out = runner.invoke(args=args + ["--prefix", "a"]).output
+    assert "Создано строк:" in out
+
+    assert User.query.filter_by(role=ROLE_OWNER).count() == 5
+    assert User.query.filter_by(role=ROLE_JOCKEY).count() == 8
+    assert Horse.query.count() == 30
+    assert Competition.query.count() == 12
+
+    for competition in Competition.query.all():
+        places = sorted(r.place for r in competition.results if r.place is not None)
+        assert places == list(range(1, len(places) + 1))
+        horse_ids = [r.horse_id for r in competition.results]
+        assert len(horse_ids) == len(set(horse_ids))
+        assert 3 <= len(horse_ids) <= 6
+
+    counters = db.session.get(SiteCounters, COUNTERS_ID)
+    assert counters.results == Result.query.count()
+    assert db.session.query(db.func.sum(JockeyStats.starts)).scalar() == counters.results
+
+    first = [(r.place, r.race_time_cs) for r in Result.query.order_by(Result.id)]
+    runner.invoke(args=args + ["--prefix", "b"])
+    second = [(r.place, r.race_time_cs) for r in Result.query.order_by(Result.id)][len(first):]
+    assert first == second
+
+    out = runner.invoke(args=args + ["--prefix", "a"]).output
+    assert "уже есть" in out
+    assert User.query.filter_by(role=ROLE_OWNER).count() == 10
+
+
+def test_seed_prefix_with_like_wildcards_touches_only_its_rows(app_ctx):
+    """
+    Модуль: CLI seed (префикс с символами % и _).
+
+    Данные:
+      - «настоящие» состязание и жокей, затем seed с префиксом «x%_».
+
+    Ожидаемое:
+      - запуск не отклонён из-за жокея, под логин которого «x%_»
+        подошёл бы как шаблон LIKE;
+      - результаты созданы только в сгенерированных состязаниях;
+      - повторный запуск с тем же префиксом отклоняется.
+    """
+    real = Competition(name="Большой летний кубок", date=date(2024, 7, 1))
+    jockey = User(username="xa_jockey", full_name="Настоящий жокей", role=ROLE_JOCKEY)
+    jockey.set_password("pass")
+    db.session.add_all([real, jockey])
+    db.session.commit()
+
+    runner = app_ctx.test_cli_runner()
+    args = [
+        "seed", "--owners", "2", "--jockeys", "3", "--horses", "6",
+        "--competitions", "4", "--min-field", "2", "--max-field", "3",
+    ]
+    out = runner.invoke(args=args + ["--prefix", "x%_"]).output
+    assert "Создано строк:" in out
+
+    assert Result.query.filter_by(competition_id=real.id).count() == 0
+    assert Result.query.filter_by(jockey_id=jockey.id).count() == 0
+    assert Competition.query.count() == 5
+    assert "уже есть" in runner.invoke(args=args + ["--prefix", "x%_"]).output
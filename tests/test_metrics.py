@@ -0,0 +1,145 @@
+from datetime import date
+
+import pytest
+
+from app import (
+    app,
+    db,
+    User,
+    Horse,
+    Competition,
+    Result,
+    LazyLoadError,
+    ROLE_JOCKEY,
+    ROLE_OWNER,
+)
+
+
+@pytest.fixture
+def sql_metrics(app_ctx):
+    metrics = app.extensions["sql_metrics"]
+    metrics.reset()
+    yield metrics
+    metrics.reset()
+
+
+def _results_with_distinct_horses(count):
+    owner = User(username="owner_m", full_name="Owner M", role=ROLE_OWNER, password_hash="-")
+    jockey = User(username="jockey_m", full_name="Jockey M", role=ROLE_JOCKEY, password_hash="-")
+    db.session.add_all([owner, jockey])
+    db.session.commit()
+    comp = Competition(name="Метрики", date=date(2025, 8, 1))
+    db.session.add(comp)
+    db.session.commit()
+    for i in range(count):
+        horse = Horse(name=f"Лошадь {i}", owner_id=owner.id)
+        db.session.add(horse)
+        db.session.flush()
+        db.session.add(Result(competition_id=comp.id, horse_id=horse.id, jockey_id=jockey.id, place=i + 1))
+    db.session.commit()
+    db.session.expunge_all()
+
+
+def test_metrics_endpoint_reports_queries_per_endpoint(client, sql_metrics, monkeypatch):
+    """
+    Модули: инструментирование SQL и /metrics.
+
+    Ожидаемое:
+      - после запроса к / в /metrics есть число запросов и время SQL
+        для эндпоинта index в формате Prometheus.
+    """
+    _results_with_distinct_horses(2)
+    client.get("/")
+
+    monkeypatch.setitem(app.config, "METRICS_TOKEN", "secret")
+    headers = {"Authorization": "Bearer secret"}
+    text = client.get("/metrics", headers=headers).get_data(as_text=True)
+    assert "# TYPE valkyria_sql_queries_total counter" in text
+    assert 'valkyria_requests_total{endpoint="index"} 1' in text
+    assert 'valkyria_sql_queries_total{endpoint="index"}' in text
+    assert 'valkyria_sql_slowest_seconds{endpoint="index",statement="SELECT' in text
+
+
+def test_repeated_lazy_loads_flagged_as_n_plus_one(app_ctx, sql_metrics, monkeypatch):
+    """
+    Модуль: обнаружение N+1.
+
+    Данные:
+      - в пределах запроса перебираются результаты и лениво
+        загружаются их лошади.
+
+    Ожидаемое:
+      - повторы ленивой загрузки засчитаны как N+1 для эндпоинта;
+      - в строгом режиме первая же ленивая загрузка вызывает LazyLoadError.
+    """
+    _results_with_distinct_horses(app.config["SQL_N_PLUS_ONE_THRESHOLD"])
+
+    with app.test_request_context("/results"):
+        app.preprocess_request()
+        names = [r.horse.name for r in Result.query.all()]
+        app.process_response(app.response_class())
+    assert len(names) == app.config["SQL_N_PLUS_ONE_THRESHOLD"]
+    assert sql_metrics.snapshot()["results_list"]["n_plus_one"] == 1
+
+    db.session.expunge_all()
+    monkeypatch.setitem(app.config, "SQL_RAISE_ON_LAZY_LOAD", True)
+    result = Result.query.first()
+    with pytest.raises(LazyLoadError):
+        result.horse
+
+
+def test_index_has_no_lazy_loads_in_strict_mode(client, sql_metrics, monkeypatch):
+    """
+    Модуль: / в строгом режиме SQL_RAISE_ON_LAZY_LOAD.
+
+    Ожидаемое:
+      - главная страница рендерится без единой ленивой загрузки.
+    """
+    _results_with_distinct_horses(3)
+    monkeypatch.setitem(app.config, "SQL_RAISE_ON_LAZY_LOAD", True)
+    assert client.get("/").status_code == 200
+
+
+def test_metrics_hidden_without_token_outside_debug(client, sql_metrics, monkeypatch):
+    """
+    Модуль: доступ к /metrics.
+
+    Ожидаемое:
+      - без METRICS_TOKEN вне отладки и тестов — 404, в отладке — 200;
+      - с токеном — 403 без заголовка и 200 с верным Bearer-токеном.
+    """
+    monkeypatch.setitem(app.config, "METRICS_TOKEN", None)
+    assert client.get("/metrics").status_code == 404
+    monkeypatch.setattr(app, "debug", True)
+    assert client.get("/metrics").status_code == 200
+    monkeypatch.setattr(app, "debug", False)
+
+    monkeypatch.setitem(app.config, "METRICS_TOKEN", "secret")
+    assert client.get("/metrics").status_code == 403
+    response = client.get("/metrics", headers={"Authorization": "Bearer secret"})
+    assert response.status_code == 200
+
+
+def test_failed_statement_timed_and_not_leaked(app_ctx, sql_metrics):
+    """
+    Модуль: замер времени SQL при ошибке запроса.
+
+    Данные:
+      - в пределах запроса выполняется SQL с ошибкой, затем обычный.
+
+    Ожидаемое:
+      - оба запроса учтены: время упавшего снимается в handle_error
+        и не смещает замер следующего.
+    """
+    from sqlalchemy import text
+    from sqlalchemy.exc import OperationalError
+
+    with app.test_request_context("/results"):
+        app.preprocess_request()
+        with pytest.raises(OperationalError):
+            db.session.execute(text("SELECT * FROM no_such_table"))
+        db.session.rollback()
+        db.session.execute(text("SELECT 1"))
+        app.process_response(app.response_class())
+
+    assert sql_metrics.snapshot()["results_list"]["queries"] == 2
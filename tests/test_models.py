@@ -51,3 +51,28 @@ def test_register_creates_jockey_with_rating(client, app_ctx):
     assert user is not None
     assert user.role == ROLE_JOCKEY
     assert user.rating == pytest.approx(4.2)
+
+
+def test_parse_and_format_race_time():
+    """
+    Модуль: parse_race_time/format_race_time.
+
+    Ожидаемое:
+      - "01:45.23" -> 10523 сотых, "1:05.5" -> 6550, "59.9" -> 5990;
+      - пустое значение -> None;
+      - некорректные строки -> ValueError;
+      - format_race_time возвращает каноническую запись.
+    """
+    from app import parse_race_time, format_race_time
+
+    assert parse_race_time("01:45.23") == 10523
+    assert parse_race_time("1:05.5") == 6550
+    assert parse_race_time("59.9") == 5990
+    assert parse_race_time("  ") is None
+
+    for bad in ("1:75.00", "abc", "01:45.234", "-1:00"):
+        with pytest.raises(ValueError):
+            parse_race_time(bad)
+
+    assert format_race_time(10523) == "01:45.23"
+    assert format_race_time(None) is None
@@ -0,0 +1,107 @@
+from datetime import date
+
+import pytest
+
+from app import app, db, Competition, ReplicaPool
+
+
+@pytest.fixture
+def replica(app_ctx, tmp_path):
+    """Реплика — отдельный файл SQLite с той же схемой."""
+    pool = ReplicaPool([f"sqlite:///{tmp_path / 'replica.db'}"])
+    engine = pool.engines[0]
+    db.metadata.create_all(engine)
+    previous = app.extensions["replicas"]
+    app.extensions["replicas"] = pool
+    yield engine
+    app.extensions["replicas"] = previous
+    engine.dispose()
+
+
+def _names(client):
+    items = client.get("/api/v1/competitions?fields=name").get_json()["items"]
+    return {item["name"] for item in items}
+
+
+def test_read_only_routes_use_replica_until_write(client, replica, admin_user, login):
+    """
+    Модули: ReplicaPool, RoutingSession, @read_only.
+
+    Данные:
+      - в основной базе и на реплике разные состязания;
+      - администратор создаёт состязание.
+
+    Ожидаемое:
+      - GET read-only маршрута читает с реплики;
+      - маршрут записи пишет в основную базу;
+      - сразу после записи тот же пользователь читает с основной базы.
+    """
+    db.session.add(Competition(name="Основная", date=date(2025, 1, 1)))
+    db.session.commit()
+    with replica.begin() as connection:
+        connection.execute(
+            db.insert(Competition), [{"name": "Реплика", "date": date(2025, 1, 1)}]
+        )
+
+    assert _names(client) == {"Реплика"}
+
+    login()
+    client.post(
+        "/competitions/create",
+        data={"name": "Новое", "date": "2025-02-01"},
+        follow_redirects=True,
+    )
+    assert Competition.query.filter_by(name="Новое").count() == 1
+    assert _names(client) == {"Основная", "Новое"}
+
+
+def test_unreachable_replica_falls_back_to_primary(client, app_ctx, tmp_path, monkeypatch):
+    """
+    Модули: ReplicaPool (проверка доступности), /metrics.
+
+    Ожидаемое:
+      - недоступная реплика пропускается, чтение идёт с основной базы;
+      - /metrics показывает её как недоступную.
+    """
+    db.session.add(Competition(name="Основная", date=date(2025, 1, 1)))
+    db.session.commit()
+
+    previous = app.extensions["replicas"]
+    app.extensions["replicas"] = ReplicaPool([f"sqlite:///{tmp_path / 'missing' / 'replica.db'}"])
+    try:
+        assert _names(client) == {"Основная"}
+        monkeypatch.setitem(app.config, "METRICS_TOKEN", "secret")
+        headers = {"Authorization": "Bearer secret"}
+        metrics = client.get("/metrics", headers=headers).get_data(as_text=True)
+        assert 'valkyria_replica_up{replica="sqlite:///' in metrics
+        assert "replica.db\"} 0" in metrics
+    finally:
+        app.extensions["replicas"] = previous
+
+
+def test_page_cached_after_write_is_rendered_from_primary(client, replica, admin_user, login):
+    """
+    Модули: cached_page, PageCache, ReplicaPool.
+
+    Данные:
+      - реплика отстаёт: записанного состязания на ней нет;
+      - сразу после записи страницу открывает другой, анонимный посетитель.
+
+    Ожидаемое:
+      - страница, попавшая в кэш после сброса, прочитана с основной базы;
+      - по окончании окна после записи промах кэша снова идёт на реплику.
+    """
+    from flask import g
+
+    login()
+    client.post("/competitions/create", data={"name": "Свежее", "date": "2025-02-01"})
+    g.pop("_login_user", None)
+
+    spectator = app.test_client()
+    assert "Свежее" in spectator.get("/").get_data(as_text=True)
+    assert "Свежее" in spectator.get("/").get_data(as_text=True)  # из кэша
+
+    cache = app.extensions["page_cache"]
+    cache.backend.clear()
+    cache.invalidated_at -= app.config["REPLICA_STICKY_SECONDS"]
+    assert "Свежее" not in spectator.get("/").get_data(as_text=True)
@@ -112,3 +112,904 @@ def test_admin_dashboard_shows_top_jockeys(client, app_ctx, admin_user, login):
     login()  # логинимся под админом
     resp = client.get("/dashboard")
     assert resp.status_code == 200
+
+
+def test_index_query_count_does_not_grow_with_data(client, app_ctx):
+    """
+    Модуль: / (публичная страница состязаний).
+
+    Данные:
+      - 5 состязаний, в каждом по 3 результата с разными жокеями и лошадьми.
+
+    Ожидаемое:
+      - страница рендерится фиксированным числом SQL-запросов
+        (без N+1 по results/jockey/horse);
+      - результаты выводятся в порядке занятых мест.
+    """
+    from sqlalchemy import event
+
+    owner = User(username="owner_i", full_name="Owner I", role=ROLE_OWNER)
+    owner.set_password("pass")
+    db.session.add(owner)
+    db.session.commit()
+
+    for c in range(5):
+        comp = Competition(name=f"Кубок {c}", date=date(2025, 3, c + 1), place="Казань")
+        db.session.add(comp)
+        db.session.flush()
+        for p in (3, 1, 2):
+            jockey = User(username=f"j_{c}_{p}", full_name=f"Жокей {c}-{p}", role=ROLE_JOCKEY)
+            jockey.set_password("pass")
+            horse = Horse(name=f"Лошадь {c}-{p}", owner_id=owner.id)
+            db.session.add_all([jockey, horse])
+            db.session.flush()
+            db.session.add(
+                Result(competition_id=comp.id, horse_id=horse.id, jockey_id=jockey.id, place=p)
+            )
+    db.session.commit()
+    db.session.expunge_all()
+    # версия данных для ETag читается раз в DATA_VERSION_TTL, а не на каждый запрос
+    app_ctx.extensions["data_version"].current()
+
+    statements = []
+
+    def _count(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(db.engine, "before_cursor_execute", _count)
+    try:
+        resp = client.get("/")
+    finally:
+        event.remove(db.engine, "before_cursor_execute", _count)
+
+    assert resp.status_code == 200
+    assert len(statements) <= 4
+    text = resp.get_data(as_text=True)
+    assert text.index("Жокей 0-1") < text.index("Жокей 0-2") < text.index("Жокей 0-3")
+
+
+def _make_race(name="Кубок", day=1):
+    owner = User(username=f"owner_{name}_{day}", full_name="Owner", role=ROLE_OWNER)
+    owner.set_password("pass")
+    jockey = User(username=f"jockey_{name}_{day}", full_name="Жокей", role=ROLE_JOCKEY)
+    jockey.set_password("pass")
+    db.session.add_all([owner, jockey])
+    db.session.commit()
+
+    horse = Horse(name=f"Лошадь {name}", owner_id=owner.id)
+    comp = Competition(name=name, date=date(2025, 6, day))
+    db.session.add_all([horse, comp])
+    db.session.commit()
+    return comp, horse, jockey
+
+
+def test_result_create_rejects_bad_race_time(client, app_ctx, admin_user, login):
+    """
+    Модуль: /results/create (валидация времени заезда).
+
+    Ожидаемое:
+      - время «1:75» отклоняется с flash-сообщением, результат не создаётся;
+      - корректное время сохраняется и в race_time_cs (сотые доли секунды).
+    """
+    comp, horse, jockey = _make_race()
+    login()
+
+    data = {
+        "competition_id": str(comp.id),
+        "horse_id": str(horse.id),
+        "jockey_id": str(jockey.id),
+        "place": "1",
+        "race_time": "1:75",
+    }
+    resp = client.post("/results/create", data=data, follow_redirects=True)
+    assert "Некорректный формат времени заезда" in resp.get_data(as_text=True)
+    assert Result.query.count() == 0
+
+    data["race_time"] = "1:45.2"
+    client.post("/results/create", data=data, follow_redirects=True)
+    result = Result.query.one()
+    assert result.race_time == "01:45.20"
+    assert result.race_time_cs == 10520
+
+
+def test_result_form_uses_lookups_instead_of_full_lists(client, app_ctx, admin_user, login):
+    """
+    Модули: /lookup/competitions, /lookup/horses, /lookup/jockeys, /results/create.
+
+    Данные:
+      - два состязания с лошадьми и жокеями;
+      - форма отправляется с id несуществующей лошади.
+
+    Ожидаемое:
+      - форма не выводит списки записей;
+      - подсказки фильтруются по префиксу и ограничиваются limit;
+      - несуществующий id отклоняется без создания результата.
+    """
+    comp, horse, jockey = _make_race("Кубок", 1)
+    _make_race("Приз", 2)
+    login()
+
+    page = client.get("/results/create").get_data(as_text=True)
+    assert "Лошадь Приз" not in page
+
+    horses = client.get("/lookup/horses?q=лошадь пр").get_json()
+    assert [item["label"] for item in horses] == ["Лошадь Приз (Owner)"]
+    competitions = client.get("/lookup/competitions?limit=1").get_json()
+    assert [item["label"] for item in competitions] == ["02.06.2025 — Приз"]
+    assert len(client.get("/lookup/jockeys?q=жок").get_json()) == 2
+
+    data = {
+        "competition_id": str(comp.id),
+        "horse_id": "999",
+        "jockey_id": str(jockey.id),
+        "race_time": "",
+    }
+    resp = client.post("/results/create", data=data, follow_redirects=True)
+    assert "из подсказок" in resp.get_data(as_text=True)
+    assert Result.query.count() == 0
+
+
+def test_backfill_race_times_command(app_ctx):
+    """
+    Модуль: CLI backfill-race-times.
+
+    Данные:
+      - результаты со строковым временем без race_time_cs, один — с мусором.
+
+    Ожидаемое:
+      - корректные строки преобразованы пакетами, мусор пропущен и отмечен.
+    """
+    comp, horse, jockey = _make_race()
+    other = Horse(name="Вторая", owner_id=horse.owner_id)
+    third = Horse(name="Третья", owner_id=horse.owner_id)
+    db.session.add_all([other, third])
+    db.session.commit()
+    db.session.add_all(
+        [
+            Result(competition_id=comp.id, horse_id=horse.id, jockey_id=jockey.id, race_time="01:45.23"),
+            Result(competition_id=comp.id, horse_id=other.id, jockey_id=jockey.id, race_time="02:00"),
+            Result(competition_id=comp.id, horse_id=third.id, jockey_id=jockey.id, race_time="быстро"),
+        ]
+    )
+    db.session.commit()
+
+    runner = app_ctx.test_cli_runner()
+    out = runner.invoke(args=["backfill-race-times", "--batch-size", "2"]).output
+    assert "Преобразовано результатов: 2." in out
+    assert "Не удалось разобрать время у 1" in out
+
+    times = dict(db.session.execute(db.select(Result.horse_id, Result.race_time_cs)).all())
+    assert times == {horse.id: 10523, other.id: 12000, third.id: None}
+
+
+def test_migrate_db_adds_columns_and_indexes(app_ctx):
+    """
+    Модуль: CLI migrate-db.
+
+    Данные:
+      - «старая» база: без индексов и без столбца race_time_cs,
+        с дублирующейся парой (состязание, лошадь).
+
+    Ожидаемое:
+      - столбец и обычные индексы добавлены;
+      - уникальный индекс пропущен, пока есть дубликаты, и создан после их удаления;
+      - устаревший индекс ix_users_role_rating удалён.
+    """
+    comp, horse, jockey = _make_race()
+    for name in ("uq_results_competition_horse", "ix_results_race_time_cs"):
+        db.session.execute(db.text(f"DROP INDEX {name}"))
+    db.session.execute(db.text("CREATE INDEX ix_users_role_rating ON users (role, rating)"))
+    db.session.execute(db.text("ALTER TABLE results DROP COLUMN race_time_cs"))
+    for _ in range(2):
+        db.session.execute(
+            db.text(
+                "INSERT INTO results (competition_id, horse_id, jockey_id, place) "
+                "VALUES (:c, :h, :j, 1)"
+            ),
+            {"c": comp.id, "h": horse.id, "j": jockey.id},
+        )
+    db.session.commit()
+
+    runner = app_ctx.test_cli_runner()
+    out = runner.invoke(args=["migrate-db"]).output
+    assert "Добавлен столбец results.race_time_cs." in out
+    assert "Создан индекс ix_results_race_time_cs." in out
+    assert "Удалён устаревший индекс ix_users_role_rating." in out
+    assert "Индекс uq_results_competition_horse не создан" in out
+
+    db.session.execute(db.text("DELETE FROM results WHERE id = (SELECT MAX(id) FROM results)"))
+    db.session.commit()
+    out = runner.invoke(args=["migrate-db"]).output
+    assert "Создан индекс uq_results_competition_horse." in out
+
+    inspector = db.inspect(db.engine)
+    indexes = {i["name"] for i in inspector.get_indexes("results")}
+    assert {"uq_results_competition_horse", "ix_results_race_time_cs"} <= indexes
+    assert "ix_users_role_rating" not in {i["name"] for i in inspector.get_indexes("users")}
+
+
+def test_result_create_rejects_duplicate_horse(client, app_ctx, admin_user, login):
+    """
+    Модуль: /results/create (уникальность пары состязание + лошадь).
+
+    Ожидаемое:
+      - повторный результат той же лошади в том же состязании отклоняется.
+    """
+    comp, horse, jockey = _make_race()
+    login()
+    data = {
+        "competition_id": str(comp.id),
+        "horse_id": str(horse.id),
+        "jockey_id": str(jockey.id),
+        "place": "1",
+    }
+    client.post("/results/create", data=data, follow_redirects=True)
+    resp = client.post("/results/create", data=data, follow_redirects=True)
+    assert "Эта лошадь уже участвует в выбранном состязании." in resp.get_data(as_text=True)
+    assert Result.query.count() == 1
+
+
+def test_public_pages_cached_until_write_route_commits(client, app_ctx, admin_user, login):
+    """
+    Модули: кэш публичных страниц (/ и /results) и его инвалидация.
+
+    Данные:
+      - анонимный посетитель открывает /results;
+      - результат добавляется в обход маршрутов, затем состязание
+        редактируется через /competitions/<id>/edit.
+
+    Ожидаемое:
+      - пока не было commit маршрута записи, /results отдаётся из кэша;
+      - commit маршрута записи сбрасывает кэш.
+    """
+    comp, horse, jockey = _make_race()
+    anon = app_ctx.test_client()
+
+    assert "Результатов пока нет." in anon.get("/results").get_data(as_text=True)
+
+    db.session.execute(
+        db.text(
+            "INSERT INTO results (competition_id, horse_id, jockey_id, place) "
+            "VALUES (:c, :h, :j, 1)"
+        ),
+        {"c": comp.id, "h": horse.id, "j": jockey.id},
+    )
+    db.session.commit()
+    assert "Результатов пока нет." in anon.get("/results").get_data(as_text=True)
+    assert horse.name in anon.get("/").get_data(as_text=True)  # главной в кэше не было
+
+    login()
+    client.post(
+        f"/competitions/{comp.id}/edit",
+        data={"name": "Кубок Обновлённый", "date": "2025-06-01", "place": "Тула"},
+    )
+    text = anon.get("/results").get_data(as_text=True)
+    assert "Результатов пока нет." not in text
+    assert "Кубок Обновлённый" in text
+
+
+def test_page_cache_follows_writes_of_other_processes(client, app_ctx):
+    """
+    Модули: cached_page, PageCache, DataVersion.
+
+    Данные:
+      - /results в кэше процесса;
+      - другой процесс добавляет результат и сдвигает data_version
+        (в этом процессе after_commit не срабатывает, кэш не сбрасывается).
+
+    Ожидаемое:
+      - пока версия в памяти не устарела, страница отдаётся из кэша;
+      - после истечения DATA_VERSION_TTL кэш промахивается по новой версии
+        и страница рендерится заново.
+    """
+    from app import bump_data_version
+
+    comp, horse, jockey = _make_race()
+    bump_data_version()
+    db.session.commit()
+    anon = app_ctx.test_client()
+    assert "Результатов пока нет." in anon.get("/results").get_data(as_text=True)
+
+    db.session.execute(
+        db.text(
+            "INSERT INTO results (competition_id, horse_id, jockey_id, place) "
+            "VALUES (:c, :h, :j, 1)"
+        ),
+        {"c": comp.id, "h": horse.id, "j": jockey.id},
+    )
+    db.session.execute(db.text("UPDATE site_counters SET data_version = data_version + 1"))
+    db.session.commit()
+    assert "Результатов пока нет." in anon.get("/results").get_data(as_text=True)
+
+    app_ctx.extensions["data_version"].invalidate()  # истёк DATA_VERSION_TTL
+    assert "Результатов пока нет." not in anon.get("/results").get_data(as_text=True)
+
+
+def test_jockey_stats_follow_result_writes(client, app_ctx, admin_user, login):
+    """
+    Модули: /results/create, /results/<id>/edit, /results/<id>/delete
+    и таблица jockey_stats.
+
+    Ожидаемое:
+      - после каждой записи статистика жокеев совпадает с полным
+        пересчётом (rebuild-jockey-stats);
+      - лучшее время пересчитывается при удалении лучшего результата.
+    """
+    from app import JockeyStats, rebuild_jockey_stats
+
+    comp, horse, jockey = _make_race()
+    comp2, horse2, jockey2 = _make_race(name="Второй", day=2)
+    login()
+
+    def stats():
+        db.session.expire_all()
+        return {
+            s.jockey_id: (s.starts, s.wins, s.podiums, s.place_sum, s.placed_count, s.best_time_cs)
+            for s in JockeyStats.query.all()
+        }
+
+    def post(url, **data):
+        client.post(url, data={k: str(v) for k, v in data.items()})
+
+    post("/results/create", competition_id=comp.id, horse_id=horse.id, jockey_id=jockey.id, place=1, race_time="01:40.00")
+    post("/results/create", competition_id=comp2.id, horse_id=horse.id, jockey_id=jockey.id, place=4, race_time="01:50.00")
+    post("/results/create", competition_id=comp.id, horse_id=horse2.id, jockey_id=jockey2.id, place=2, race_time="01:41.00")
+    assert stats()[jockey.id] == (2, 1, 1, 5, 2, 10000)
+
+    first = Result.query.filter_by(competition_id=comp.id, horse_id=horse.id).one()
+    post(f"/results/{first.id}/edit", competition_id=comp.id, horse_id=horse.id, jockey_id=jockey2.id, place=3, race_time="01:39.00")
+    incremental = stats()
+    assert incremental[jockey.id] == (1, 0, 0, 4, 1, 11000)
+    assert incremental[jockey2.id] == (2, 0, 2, 5, 2, 9900)
+
+    post(f"/results/{first.id}/delete")
+    incremental = stats()
+    assert incremental[jockey2.id] == (1, 0, 1, 2, 1, 10100)
+
+    rebuild_jockey_stats()
+    assert stats() == incremental
+
+    text = client.get("/dashboard").get_data(as_text=True)
+    assert "Лидеры по победам" in text
+    assert "01:41.00" in text
+
+
+def test_stats_rows_without_starts_removed_like_rebuild(client, app_ctx, admin_user, login):
+    """
+    Модули: apply_stats, /results/<id>/edit, /results/<id>/delete,
+    rebuild_jockey_stats, rebuild_horse_stats.
+
+    Данные:
+      - результат переназначается другой лошади и жокею, затем удаляется.
+
+    Ожидаемое:
+      - строки статистики без стартов удаляются сразу;
+      - таблицы jockey_stats, horse_stats и horse_jockey_stats после
+        каждой записи совпадают с полным пересчётом.
+    """
+    from app import HorseJockeyStats, HorseStats, JockeyStats, rebuild_horse_stats, rebuild_jockey_stats
+
+    comp, horse, jockey = _make_race()
+    _, horse2, jockey2 = _make_race(name="Второй", day=2)
+    login()
+
+    def tables():
+        db.session.expire_all()
+        return {
+            model.__tablename__: {
+                tuple(getattr(row, c.name) for c in model.__table__.primary_key): (
+                    row.starts,
+                    row.wins,
+                    row.podiums,
+                    row.best_time_cs,
+                )
+                for row in model.query
+            }
+            for model in (JockeyStats, HorseStats, HorseJockeyStats)
+        }
+
+    def rebuilt():
+        incremental = tables()
+        rebuild_jockey_stats()
+        rebuild_horse_stats()
+        db.session.commit()
+        assert tables() == incremental
+        return incremental
+
+    client.post("/results/create", data={
+        "competition_id": comp.id, "horse_id": horse.id, "jockey_id": jockey.id,
+        "place": "1", "race_time": "01:40.00",
+    })
+    row = Result.query.one()
+    assert rebuilt()["horse_jockey_stats"] == {(horse.id, jockey.id): (1, 1, 1, 10000)}
+
+    client.post(f"/results/{row.id}/edit", data={
+        "competition_id": comp.id, "horse_id": horse2.id, "jockey_id": jockey2.id,
+        "place": "2", "race_time": "01:41.00",
+    })
+    state = rebuilt()
+    assert state["jockey_stats"] == {(jockey2.id,): (1, 0, 1, 10100)}
+    assert set(state["horse_stats"]) == {(horse2.id,)}
+
+    client.post(f"/results/{row.id}/delete")
+    assert rebuilt() == {"jockey_stats": {}, "horse_stats": {}, "horse_jockey_stats": {}}
+
+
+def test_horse_stats_and_career_page_follow_result_writes(client, app_ctx, admin_user, login):
+    """
+    Модули: /results/create, /results/<id>/edit, /results/<id>/delete,
+    таблицы horse_stats, horse_jockey_stats и карточка /horses/<id>.
+
+    Ожидаемое:
+      - сводка, среднее время и форма лошади обновляются при каждой записи
+        и совпадают с полным пересчётом (rebuild-horse-stats);
+      - форма строится по дате состязания, а не по порядку ввода;
+      - карточка показывает форму и историю жокеев фиксированным числом запросов.
+    """
+    from flask import g
+    from sqlalchemy import event
+
+    from app import HorseJockeyStats, HorseStats, rebuild_horse_stats
+
+    comp, horse, jockey = _make_race()
+    comp2, _, jockey2 = _make_race(name="Второй", day=2)
+    comp3, _, _ = _make_race(name="Третий", day=3)
+    login()
+
+    def stats():
+        db.session.expire_all()
+        row = db.session.get(HorseStats, horse.id)
+        pairs = {
+            (s.jockey_id, s.starts, s.wins, s.best_time_cs)
+            for s in HorseJockeyStats.query.filter_by(horse_id=horse.id)
+        }
+        return (row.starts, row.wins, row.podiums, row.best_time_cs, row.average_time_cs, row.form), pairs
+
+    def post(url, **data):
+        client.post(url, data={k: str(v) for k, v in data.items()})
+
+    post("/results/create", competition_id=comp3.id, horse_id=horse.id, jockey_id=jockey.id, place=12, race_time="01:50.00")
+    post("/results/create", competition_id=comp.id, horse_id=horse.id, jockey_id=jockey.id, place=1, race_time="01:40.00")
+    post("/results/create", competition_id=comp2.id, horse_id=horse.id, jockey_id=jockey2.id, place="", race_time="")
+    assert stats() == (
+        (3, 1, 1, 10000, 10500, "1x0"),
+        {(jockey.id, 2, 1, 10000), (jockey2.id, 1, 0, None)},
+    )
+
+    middle = Result.query.filter_by(competition_id=comp2.id).one()
+    post(f"/results/{middle.id}/edit", competition_id=comp2.id, horse_id=horse.id, jockey_id=jockey.id, place=2, race_time="01:45.00")
+    first = Result.query.filter_by(competition_id=comp.id).one()
+    post(f"/results/{first.id}/delete")
+    incremental = stats()
+    assert incremental == (
+        (2, 0, 1, 10500, 10750, "20"),
+        {(jockey.id, 2, 0, 10500)},
+    )
+
+    rebuild_horse_stats()
+    db.session.commit()
+    assert stats() == incremental
+
+    statements = []
+
+    def _count(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    g.pop("_login_user", None)
+    db.session.expunge_all()
+    event.listen(db.engine, "before_cursor_execute", _count)
+    try:
+        text = client.get(f"/horses/{horse.id}").get_data(as_text=True)
+    finally:
+        event.remove(db.engine, "before_cursor_execute", _count)
+    assert "<strong>20</strong>" in text
+    assert "Жокей" in text
+    assert len(statements) <= 5  # вместе с загрузкой текущего пользователя
+
+
+def test_result_events_published_after_commit(client, app_ctx, admin_user, login):
+    """
+    Модули: /competitions/<id>/events и рассылка событий о результатах.
+
+    Ожидаемое:
+      - поток SSE отдаётся с типом text/event-stream;
+      - после commit /results/create подписчик состязания получает
+        событие result с кличкой лошади и жокеем, подписчики других
+        состязаний — ничего;
+      - строки результатов сегодняшнего состязания на главной помечены id
+        и местом — live.js обновляет их на месте по данным события.
+    """
+    import json
+
+    from app import app
+
+    comp, horse, jockey = _make_race()
+    other, _, _ = _make_race(name="Другой", day=2)
+    comp.date = date.today()
+    db.session.commit()
+    broadcaster = app.extensions["broadcaster"]
+
+    resp = client.get(f"/competitions/{comp.id}/events")
+    assert resp.mimetype == "text/event-stream"
+    assert next(resp.response).startswith(b"retry:")
+    resp.close()
+    assert broadcaster.subscriber_count(comp.id) == 0
+
+    subscriber = broadcaster.subscribe(comp.id)
+    bystander = broadcaster.subscribe(other.id)
+    try:
+        login()
+        client.post(
+            "/results/create",
+            data={
+                "competition_id": str(comp.id),
+                "horse_id": str(horse.id),
+                "jockey_id": str(jockey.id),
+                "place": "1",
+                "race_time": "01:45.00",
+            },
+        )
+        message = subscriber.get_nowait()
+        assert message.startswith("event: result\n")
+        payload = json.loads(message.split("data: ", 1)[1])
+        assert payload["horse"] == horse.name
+        assert payload["race_time"] == "01:45.00"
+        assert bystander.empty()
+
+        html = client.get("/").get_data(as_text=True)
+        assert f'/competitions/{comp.id}/events' in html
+        assert f'data-result-id="{payload["id"]}" data-place="1"' in html
+    finally:
+        broadcaster.unsubscribe(comp.id, subscriber)
+        broadcaster.unsubscribe(other.id, bystander)
+
+
+def test_admin_dashboard_counters_maintained_and_reconciled(client, app_ctx, admin_user, login):
+    """
+    Модули: /dashboard (администратор), счётчики site_counters,
+    CLI reconcile-counters.
+
+    Ожидаемое:
+      - создание состязания и результата через маршруты меняет счётчики;
+      - запись в обход маршрутов даёт расхождение, которое исправляет
+        reconcile-counters.
+    """
+    import re
+
+    from app import SiteCounters
+
+    comp, horse, jockey = _make_race()
+    login()
+
+    def counts():
+        text = client.get("/dashboard").get_data(as_text=True)
+        return [int(n) for n in re.findall(r"Количество [а-я]+: (\d+)", text)]
+
+    assert counts() == [1, 1, 0]  # первая строка счётчиков — полным пересчётом
+
+    client.post(
+        "/competitions/create",
+        data={"name": "Новый", "date": "2025-07-01"},
+    )
+    client.post(
+        "/results/create",
+        data={
+            "competition_id": str(comp.id),
+            "horse_id": str(horse.id),
+            "jockey_id": str(jockey.id),
+        },
+    )
+    assert counts() == [2, 1, 1]
+
+    db.session.add(Horse(name="Тайная", owner_id=horse.owner_id))
+    db.session.commit()
+    assert counts() == [2, 1, 1]
+
+    out = app_ctx.test_cli_runner().invoke(args=["reconcile-counters"]).output
+    assert "horses: 1 -> 2" in out
+    assert db.session.get(SiteCounters, 1).horses == 2
+
+
+def test_season_leaderboards_ranked_and_cached_per_season(client, app_ctx, admin_user, login):
+    """
+    Модули: /leaderboards/<сезон>, compute_standings, StandingsCache.
+
+    Данные:
+      - заезды прошлого (2024) и текущего сезона;
+      - результаты меняются через маршруты и напрямую в базе.
+
+    Ожидаемое:
+      - очки по местам, равные показатели делят место (RANK);
+      - таблица завершённого сезона берётся из кэша и не пересчитывается,
+        пока запись результата этого сезона не сбросит её;
+      - таблица текущего сезона обновляется после записи результата.
+    """
+    from app import compute_standings, season_standings
+
+    current = date.today().year
+    old_comp, horse_a, jockey_a = _make_race("Старый", 1)
+    old_comp.date = date(2024, 6, 1)
+    _, horse_b, jockey_b = _make_race("Второй", 2)
+    new_comp, _, _ = _make_race("Новый", 3)
+    new_comp.date = date(current, 1, 10)
+    db.session.commit()
+    login()
+
+    def post(url, **data):
+        client.post(url, data={k: str(v) for k, v in data.items()})
+
+    post("/results/create", competition_id=old_comp.id, horse_id=horse_a.id, jockey_id=jockey_a.id, place=1)
+    post("/results/create", competition_id=old_comp.id, horse_id=horse_b.id, jockey_id=jockey_b.id, place=2)
+    post("/results/create", competition_id=new_comp.id, horse_id=horse_a.id, jockey_id=jockey_b.id, place=3)
+    post("/results/create", competition_id=new_comp.id, horse_id=horse_b.id, jockey_id=jockey_a.id, place=3)
+
+    closed = season_standings(2024, "jockeys")
+    assert [(r.rank, r.id, r.points, r.wins) for r in closed] == [
+        (1, jockey_a.id, 25, 1),
+        (2, jockey_b.id, 18, 0),
+    ]
+    assert [(r.rank, r.points) for r in season_standings(current, "horses")] == [(1, 15), (1, 15)]
+    assert [r.starts for r in season_standings(2024, "owners")] == [1, 1]
+
+    # прямое изменение мимо маршрутов: завершённый сезон остаётся в кэше
+    db.session.execute(db.update(Result).where(Result.place == 2).values(place=1))
+    db.session.commit()
+    assert season_standings(2024, "jockeys") == closed
+    assert compute_standings(2024, "jockeys", 10)[1].points == 25
+
+    # запись через маршрут сбрасывает таблицы своего сезона
+    second = Result.query.filter_by(competition_id=old_comp.id, horse_id=horse_b.id).one()
+    post(f"/results/{second.id}/edit", competition_id=old_comp.id, horse_id=horse_b.id, jockey_id=jockey_b.id, place=1)
+    assert [(r.rank, r.points) for r in season_standings(2024, "jockeys")] == [(1, 25), (1, 25)]
+
+    later = Competition(name="Финал", date=date(current, 1, 20))
+    db.session.add(later)
+    db.session.commit()
+    post("/results/create", competition_id=later.id, horse_id=horse_a.id, jockey_id=jockey_a.id, place=1)
+    top = season_standings(current, "horses")[0]
+    assert (top.id, top.points, top.name) == (horse_a.id, 40, horse_a.name)
+
+    text = client.get(f"/leaderboards/{current}").get_data(as_text=True)
+    assert "Рейтинги сезона" in text and horse_a.name in text
+    assert client.get("/leaderboards/1990").status_code == 404
+
+
+def test_elo_ratings_follow_writes_and_match_full_recompute(client, app_ctx, admin_user, login):
+    """
+    Модули: update_competition_ratings, recompute_ratings, /ratings/recompute.
+
+    Данные:
+      - два состязания по очереди, затем правка первого (прошлого).
+
+    Ожидаемое:
+      - изменения в состязании в сумме нулевые, победитель растёт;
+      - рейтинги после записей по порядку совпадают с полным пересчётом;
+      - правка прошлого состязания помечает рейтинги устаревшими,
+        пересчёт с дашборда снимает отметку;
+      - топ жокеев администратора строится по рейтингу Эло.
+    """
+    import pytest
+
+    from app import (
+        Rating,
+        RatingHistory,
+        SiteCounters,
+        COUNTERS_ID,
+        recompute_ratings,
+    )
+
+    first, horse_a, jockey_a = _make_race("Первый", 1)
+    second, horse_b, jockey_b = _make_race("Второй", 2)
+    login()
+
+    def post(url, **data):
+        client.post(url, data={k: str(v) for k, v in data.items()})
+
+    def ratings():
+        db.session.expire_all()
+        return {(r.kind, r.entity_id): (round(r.rating, 6), r.races) for r in Rating.query}
+
+    for comp in (first, second):
+        post("/results/create", competition_id=comp.id, horse_id=horse_a.id, jockey_id=jockey_a.id, place=1)
+        post("/results/create", competition_id=comp.id, horse_id=horse_b.id, jockey_id=jockey_b.id, place="")
+
+    incremental = ratings()
+    assert incremental[("jockey", jockey_a.id)][0] > 1500 > incremental[("jockey", jockey_b.id)][0]
+    assert sum(r for (kind, _), (r, _) in incremental.items() if kind == "horse") == pytest.approx(3000)
+    assert incremental[("horse", horse_a.id)][1] == 2
+    assert RatingHistory.query.count() == 8
+
+    recompute_ratings()
+    db.session.commit()
+    assert ratings() == incremental
+
+    row = Result.query.filter_by(competition_id=first.id, horse_id=horse_b.id).one()
+    post(f"/results/{row.id}/edit", competition_id=first.id, horse_id=horse_b.id, jockey_id=jockey_b.id, place=1)
+    assert db.session.get(SiteCounters, COUNTERS_ID).ratings_stale
+
+    text = client.get("/dashboard").get_data(as_text=True)
+    assert "рейтинги нужно пересчитать" in text
+    client.post("/ratings/recompute")
+    db.session.expire_all()
+    assert not db.session.get(SiteCounters, COUNTERS_ID).ratings_stale
+    text = client.get("/dashboard").get_data(as_text=True)
+    assert text.index("Рейтинг жокеев (Эло)") < text.index("Жокей —")
+
+
+def test_horse_delete_removes_its_rating_history(client, app_ctx, admin_user, login):
+    """
+    Модуль: /horses/<id>/delete (рейтинг и история рейтинга лошади).
+
+    Данные:
+      - две лошади с рейтингом и историей по одному состязанию
+        (история лошади осталась после снятия её результатов).
+
+    Ожидаемое:
+      - удаление лошади убирает её рейтинг и историю в той же транзакции;
+      - история другой лошади не тронута.
+    """
+    from app import Rating, RatingHistory
+
+    comp, horse, _ = _make_race("История", 1)
+    _, other, _ = _make_race("История", 2)
+    for h in (horse, other):
+        db.session.add(Rating(kind="horse", entity_id=h.id, rating=1510.0, races=1))
+        db.session.add(
+            RatingHistory(
+                kind="horse", entity_id=h.id, competition_id=comp.id,
+                competition_date=comp.date, rating_before=1500.0, rating_after=1510.0,
+            )
+        )
+    db.session.commit()
+    login()
+
+    client.post(f"/horses/{horse.id}/delete")
+
+    db.session.expire_all()
+    assert db.session.get(Horse, horse.id) is None
+    assert [r.entity_id for r in Rating.query] == [other.id]
+    assert [h.entity_id for h in RatingHistory.query] == [other.id]
+
+
+def test_vectorized_rating_recompute_matches_sequential(app_ctx):
+    """
+    Модули: _recompute_numpy, _recompute_python (синтетический набор seed).
+
+    Ожидаемое:
+      - векторизованный пересчёт по слоям даёт те же рейтинги и историю,
+        что и последовательный проход по состязаниям, в том числе когда
+        жокей дважды участвует в одном состязании.
+    """
+    import pytest
+
+    pytest.importorskip("numpy")
+    from app import Competition as C, _recompute_numpy, _recompute_python, generate_dataset
+
+    generate_dataset(owners=5, jockeys=12, horses=40, competitions=60, min_field=2, max_field=9, seed=7)
+    rows = db.session.execute(
+        db.select(Result.competition_id, C.date, Result.jockey_id, Result.horse_id, Result.place)
+        .join(C, Result.competition_id == C.id)
+        .order_by(C.date, C.id, Result.id)
+    ).all()
+
+    day = date(2025, 1, 1)
+    doubled = [(1, day, 5, 7, 1), (1, day, 5, 8, 2), (2, day, 5, 7, None), (2, day, 6, 9, 1)]
+
+    for data in (rows, doubled):
+        vector_history, vector_current = _recompute_numpy(data, 1500.0, 32.0)
+        plain_history, plain_current = _recompute_python(data, 1500.0, 32.0)
+
+        assert vector_current.keys() == plain_current.keys()
+        for key, (rating, races) in plain_current.items():
+            assert vector_current[key][0] == pytest.approx(rating)
+            assert vector_current[key][1] == races
+        assert len(vector_history) == len(plain_history)
+        for vector, plain in zip(sorted(vector_history), sorted(plain_history)):
+            assert vector[:4] == plain[:4]
+            assert vector[4:] == pytest.approx(plain[4:])
+
+
+def test_finishing_order_form_saves_whole_competition(client, app_ctx, admin_user, login):
+    """
+    Модули: /competitions/<id>/results (протокол состязания), save_finishing_order.
+
+    Данные:
+      - у состязания уже есть результат лошади, которой нет в новом протоколе;
+      - протокол с повтором места, затем исправленный протокол.
+
+    Ожидаемое:
+      - ошибочный протокол не меняет данные, ошибка видна у своей строки;
+      - исправленный протокол добавляет, обновляет и снимает строки сразу;
+      - счётчики и статистика жокеев согласованы с результатами.
+    """
+    from app import JockeyStats, SiteCounters, COUNTERS_ID
+
+    comp, horse_a, jockey_a = _make_race("Протокол", 1)
+    _, horse_b, jockey_b = _make_race("Протокол", 2)
+    _, horse_c, jockey_c = _make_race("Протокол", 3)
+    login()
+    client.post(
+        "/results/create",
+        data={"competition_id": comp.id, "horse_id": horse_c.id, "jockey_id": jockey_c.id, "place": "1"},
+    )
+
+    def protocol(*rows):
+        blank = [("", "", "", "")]
+        rows = list(rows) + blank
+        return {
+            "horse_id": [str(r[0]) for r in rows],
+            "horse_label": ["" for _ in rows],
+            "jockey_id": [str(r[1]) for r in rows],
+            "jockey_label": ["" for _ in rows],
+            "place": [str(r[2]) for r in rows],
+            "race_time": [r[3] for r in rows],
+        }
+
+    resp = client.post(
+        f"/competitions/{comp.id}/results",
+        data=protocol((horse_a.id, jockey_a.id, 1, "01:40.00"), (horse_b.id, jockey_b.id, 1, "")),
+    )
+    assert resp.status_code == 400
+    assert "место 1 уже занято в строке 1" in resp.get_data(as_text=True)
+    assert [r.horse_id for r in Result.query] == [horse_c.id]
+
+    resp = client.post(
+        f"/competitions/{comp.id}/results",
+        data=protocol((horse_a.id, jockey_a.id, 1, "01:40.00"), (horse_b.id, jockey_b.id, "", "")),
+        follow_redirects=True,
+    )
+    assert "добавлено 2, обновлено 0, снято 1" in resp.get_data(as_text=True)
+
+    db.session.expire_all()
+    rows = {r.horse_id: (r.jockey_id, r.place, r.race_time_cs) for r in Result.query}
+    assert rows == {horse_a.id: (jockey_a.id, 1, 10000), horse_b.id: (jockey_b.id, None, None)}
+    assert db.session.get(SiteCounters, COUNTERS_ID).results == 2
+    assert db.session.get(JockeyStats, jockey_a.id).wins == 1
+    assert db.session.get(JockeyStats, jockey_c.id) is None
+
+    text = client.get(f"/competitions/{comp.id}/results").get_data(as_text=True)
+    assert text.index("Лошадь Протокол") < text.index("01:40.00")
+
+
+def test_finishing_order_json_is_all_or_nothing(client, app_ctx, admin_user, login):
+    """
+    Модуль: PUT /api/v1/competitions/<id>/results.
+
+    Данные:
+      - протокол с неизвестным жокеем и повтором лошади, затем корректный.
+
+    Ожидаемое:
+      - без прав администратора — 403;
+      - ошибки перечислены по строкам (422), ничего не записано;
+      - корректный протокол записан, повторная отправка только обновляет строки.
+    """
+    comp, horse_a, jockey_a = _make_race("JSON", 1)
+    _, horse_b, jockey_b = _make_race("JSON", 2)
+    url = f"/api/v1/competitions/{comp.id}/results"
+    good = {
+        "results": [
+            {"horse_id": horse_a.id, "jockey_id": jockey_a.id, "place": 2, "race_time": "01:41.00"},
+            {"horse_id": horse_b.id, "jockey_id": jockey_b.id, "place": 1, "race_time": "01:40.50"},
+        ]
+    }
+
+    assert client.put(url, json=good).status_code == 403
+    login()
+
+    bad = {
+        "results": [
+            {"horse_id": horse_a.id, "jockey_id": 999, "place": 1},
+            {"horse_id": horse_a.id, "jockey_id": jockey_a.id, "place": 2},
+            {"horse_id": horse_b.id, "jockey_id": jockey_b.id, "race_time": "вчера"},
+        ]
+    }
+    resp = client.put(url, json=bad)
+    assert resp.status_code == 422
+    assert [row["row"] for row in resp.get_json()["rows"]] == [1, 2, 3]
+    assert Result.query.count() == 0
+
+    resp = client.put(url, json=good)
+    assert resp.get_json() == {"inserted": 2, "updated": 0, "deleted": 0}
+    resp = client.put(url, json=good)
+    assert resp.get_json() == {"inserted": 0, "updated": 2, "deleted": 0}
+    assert client.put(f"/api/v1/competitions/{comp.id + 100}/results", json=good).status_code == 404